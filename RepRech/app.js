@@ -13,7 +13,10 @@ const state = {
   },
   page: 1,
   pageSize: 20,
-  totalPages: 1
+  totalPages: 1,
+  cursor: null,
+  nextCursor: null,
+  prevCursor: null
 };
 
 const ui = {};
@@ -119,6 +122,13 @@ function goToPage(targetPage) {
   if (targetPage < 1 || targetPage > state.totalPages) {
     return;
   }
+  if (targetPage === state.page + 1) {
+    state.cursor = state.nextCursor;
+  } else if (targetPage === state.page - 1) {
+    state.cursor = state.prevCursor;
+  } else {
+    state.cursor = null;
+  }
   state.page = targetPage;
   loadRows().catch((error) => handleError(error, "No se pudo cambiar de p?gina."));
 }
@@ -159,6 +169,9 @@ async function loadRows(options = {}) {
   const params = new URLSearchParams();
   params.append("page", String(state.page));
   params.append("page_size", String(state.pageSize));
+  if (state.cursor && state.page > 1) {
+    params.append("cursor", state.cursor);
+  }
 
   if (state.filters.from) {
     params.append("from", state.filters.from);
@@ -189,6 +202,8 @@ async function loadRows(options = {}) {
   state.totalPages = typeof payload.total_pages === "number"
     ? Math.max(1, payload.total_pages)
     : Math.max(1, Math.ceil((state.total || 0) / state.pageSize));
+  state.nextCursor = payload.next_cursor || null;
+  state.prevCursor = payload.prev_cursor || null;
 
   if (
     !skipDefaulting &&
@@ -417,6 +432,8 @@ async function removeResolvedRows() {
   if (!response.ok) {
     throw new Error(`HTTP ${response.status}`);
   }
+  state.page = 1;
+  state.cursor = null;
   await loadRows({ additionalMessage: "Filas resueltas eliminadas." });
 }
 
@@ -1,12 +1,15 @@
+import base64
 import json
 import math
 import os
+import re
 import sqlite3
-import time
+import threading
 import unicodedata
-from typing import Iterable, List, Sequence, Tuple
+from typing import List, Sequence, Tuple
 
-from flask import Flask, abort, jsonify, request, send_from_directory
+import orjson
+from flask import Flask, Response, abort, request, send_from_directory
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 DB_PATH = os.path.join(BASE_DIR, "data.db")
@@ -20,32 +23,48 @@ COLUMNS: Tuple[str, ...] = (
     "RepLiqEstadoConsulta",
     "RepDetalleRechazo",
 )
+DATE_INDEX = COLUMNS.index("RepFecha")
+DETAIL_INDEX = COLUMNS.index("RepDetalleRechazo")
+HEADER_PATTERN = re.compile(
+    "|".join(re.escape(label) for label in sorted(COLUMNS, key=len, reverse=True))
+)
 FALLBACK_POSITIONS: Tuple[int, ...] = (0, 12, 124, 165, 189, 209)
+DATE_PATTERN = re.compile(r"\s*([0-9]{4}-[0-9]{2}-[0-9]{2})")
 IGNORED_DETAIL_PREFIXES_RAW: Tuple[str, ...] = (
     "En la fecha de resumen del reporte la condici\u00f3n de emisor electr\u00f3nico no estaba vigente",
 )
 
 app = Flask(__name__, static_folder=".", static_url_path="")
-app.config["JSON_AS_ASCII"] = False
+
+
+class _CombiningMarks(dict):
+    def __missing__(self, codepoint: int) -> int | None:
+        value = None if unicodedata.category(chr(codepoint)) == "Mn" else codepoint
+        self[codepoint] = value
+        return value
+
+
+_COMBINING_MARKS = _CombiningMarks()
 
 
 def normalize_detail(text: str) -> str:
     if not text:
         return ""
+    if text.isascii():
+        return text.lower().strip()
     normalized = unicodedata.normalize("NFD", text)
-    stripped = "".join(ch for ch in normalized if unicodedata.category(ch) != "Mn")
-    return stripped.lower().strip()
+    return normalized.translate(_COMBINING_MARKS).lower().strip()
 
 
 def fix_text(value: str | None) -> str:
     if not value:
         return ""
-    if "?" in value or "?" in value or "?" in value:
-        try:
-            return value.encode("latin-1").decode("utf-8")
-        except UnicodeDecodeError:
-            return value
-    return value
+    if value.isascii() or "?" not in value:
+        return value
+    try:
+        return value.encode("latin-1").decode("utf-8")
+    except UnicodeDecodeError:
+        return value
 
 
 IGNORED_DETAIL_PREFIXES: Tuple[str, ...] = tuple(
@@ -53,36 +72,131 @@ IGNORED_DETAIL_PREFIXES: Tuple[str, ...] = tuple(
 )
 
 
+_local = threading.local()
+
+
 def get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -20000")
+        conn.execute("PRAGMA mmap_size = 268435456")
+        _local.conn = conn
     return conn
 
 
 def ensure_database() -> None:
     conn = get_connection()
-    try:
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rows (
+            id TEXT PRIMARY KEY,
+            EmpRUC TEXT,
+            EmpRazonSocial TEXT,
+            EmpNom TEXT,
+            RepFecha TEXT,
+            RepFechaDate TEXT,
+            RepLiqEstadoConsulta TEXT,
+            RepDetalleRechazo TEXT,
+            detail_normalized TEXT,
+            resolved INTEGER NOT NULL DEFAULT 0,
+            created_at INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS row_sources (
+            row_id TEXT NOT NULL,
+            source TEXT NOT NULL,
+            PRIMARY KEY (row_id, source)
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_rows_fecha ON rows (RepFechaDate)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_rows_resolved ON rows (resolved) WHERE resolved = 1"
+    )
+    conn.execute("DROP INDEX IF EXISTS idx_rows_created")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_rows_created_at ON rows (created_at)")
+    ensure_detail_index(conn)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < 1:
+        repair_stored_text(conn)
+        conn.execute("PRAGMA user_version = 1")
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(rows)")}
+    if "sources" in columns:
+        migrate_sources_column(conn)
+    conn.commit()
+    conn.close()
+    _local.conn = None
+
+
+def ensure_detail_index(conn: sqlite3.Connection) -> None:
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rows_fts'"
+    ).fetchone()
+    if exists is None:
         conn.execute(
             """
-            CREATE TABLE IF NOT EXISTS rows (
-                id TEXT PRIMARY KEY,
-                EmpRUC TEXT,
-                EmpRazonSocial TEXT,
-                EmpNom TEXT,
-                RepFecha TEXT,
-                RepFechaDate TEXT,
-                RepLiqEstadoConsulta TEXT,
-                RepDetalleRechazo TEXT,
-                detail_normalized TEXT,
-                resolved INTEGER NOT NULL DEFAULT 0,
-                sources TEXT,
-                created_at INTEGER NOT NULL
+            CREATE VIRTUAL TABLE rows_fts USING fts5(
+                detail_normalized,
+                content = 'rows',
+                content_rowid = 'rowid',
+                tokenize = 'trigram'
             )
             """
         )
-        conn.commit()
-    finally:
-        conn.close()
+        conn.execute("INSERT INTO rows_fts (rows_fts) VALUES ('rebuild')")
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS rows_fts_delete AFTER DELETE ON rows BEGIN
+            INSERT INTO rows_fts (rows_fts, rowid, detail_normalized)
+            VALUES ('delete', old.rowid, old.detail_normalized);
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS rows_fts_update AFTER UPDATE OF detail_normalized ON rows BEGIN
+            INSERT INTO rows_fts (rows_fts, rowid, detail_normalized)
+            VALUES ('delete', old.rowid, old.detail_normalized);
+            INSERT INTO rows_fts (rowid, detail_normalized)
+            VALUES (new.rowid, new.detail_normalized);
+        END
+        """
+    )
+
+
+def repair_stored_text(conn: sqlite3.Connection) -> None:
+    columns = ", ".join(COLUMNS)
+    updates: List[tuple] = []
+    for row in conn.execute(f"SELECT id, {columns} FROM rows"):
+        original = [row[column] or "" for column in COLUMNS]
+        values = [fix_text(value) for value in original]
+        if values == original:
+            continue
+        detail_normalized = normalize_detail(values[DETAIL_INDEX])
+        updates.append((*values, detail_normalized, row["id"]))
+
+    if updates:
+        assignments = ", ".join(f"{column} = ?" for column in COLUMNS)
+        conn.executemany(
+            f"UPDATE rows SET {assignments}, detail_normalized = ? WHERE id = ?",
+            updates,
+        )
+
+
+def migrate_sources_column(conn: sqlite3.Connection) -> None:
+    links: List[tuple] = []
+    for row in conn.execute("SELECT id, sources FROM rows WHERE sources IS NOT NULL ORDER BY rowid"):
+        links.extend((row["id"], fix_text(source)) for source in json.loads(row["sources"]))
+    conn.executemany("INSERT OR IGNORE INTO row_sources (row_id, source) VALUES (?, ?)", links)
+    conn.execute("ALTER TABLE rows DROP COLUMN sources")
 
 
 def maybe_load_initial_data() -> None:
@@ -90,10 +204,7 @@ def maybe_load_initial_data() -> None:
         return
 
     conn = get_connection()
-    try:
-        has_rows = conn.execute("SELECT 1 FROM rows LIMIT 1").fetchone() is not None
-    finally:
-        conn.close()
+    has_rows = conn.execute("SELECT 1 FROM rows LIMIT 1").fetchone() is not None
 
     if has_rows:
         return
@@ -106,7 +217,7 @@ def maybe_load_initial_data() -> None:
 
     records = parse_rpt(content)
     if records:
-        insert_records(records, "result.rpt")
+        insert_records(records, "result.rpt", only_if_empty=True)
 
 
 def parse_rpt(content: str) -> List[dict]:
@@ -114,27 +225,26 @@ def parse_rpt(content: str) -> List[dict]:
         return []
 
     records: List[dict] = []
-    lines = content.splitlines()
-    column_positions: Sequence[int] | None = None
+    lines = content.replace("\x00", "").splitlines()
+    column_slices: Sequence[slice] | None = None
 
-    for raw_line in lines:
-        sanitized_line = raw_line.replace("\x00", "")
+    for sanitized_line in lines:
         trimmed = sanitized_line.strip()
 
         if not trimmed:
             continue
 
         if trimmed.startswith("EmpRUC"):
-            column_positions = detect_column_positions(sanitized_line)
+            column_slices = build_column_slices(detect_column_positions(sanitized_line))
             continue
 
         if trimmed.startswith("---"):
             continue
 
-        if column_positions is None:
-            column_positions = FALLBACK_POSITIONS
+        if column_slices is None:
+            column_slices = build_column_slices(FALLBACK_POSITIONS)
 
-        record = parse_fixed_width_line(sanitized_line, column_positions)
+        record = parse_fixed_width_line(sanitized_line, column_slices)
         if record:
             records.append(record)
 
@@ -142,78 +252,58 @@ def parse_rpt(content: str) -> List[dict]:
 
 
 def detect_column_positions(header_line: str) -> Sequence[int]:
-    positions: List[int] = []
-    for label in COLUMNS:
-        index = header_line.find(label)
-        if index < 0:
-            return FALLBACK_POSITIONS
-        positions.append(index)
-    return positions
-
-
-def parse_fixed_width_line(line: str, positions: Sequence[int]) -> dict | None:
-    values: List[str] = []
-    for idx, start in enumerate(positions):
-        end = positions[idx + 1] if idx + 1 < len(positions) else len(line)
-        if start >= len(line):
-            slice_value = ""
-        else:
-            slice_value = line[start:end]
-        values.append(fix_text(slice_value.strip()))
+    found: dict[str, int] = {}
+    for match in HEADER_PATTERN.finditer(header_line):
+        found.setdefault(match.group(), match.start())
+    if len(found) != len(COLUMNS):
+        return FALLBACK_POSITIONS
+    return [found[label] for label in COLUMNS]
 
-    if not values or not values[0]:
-        return None
 
-    return {column: values[idx] if idx < len(values) else "" for idx, column in enumerate(COLUMNS)}
+def build_column_slices(positions: Sequence[int]) -> List[slice]:
+    ends = list(positions[1:]) + [None]
+    return [slice(start, end) for start, end in zip(positions, ends)]
 
 
-def build_key(record: dict) -> str:
-    return "||".join((record.get(column, "") or "").strip() for column in COLUMNS)
+def parse_fixed_width_line(line: str, slices: Sequence[slice]) -> dict | None:
+    values = [line[column_slice].strip() for column_slice in slices]
+    if not line.isascii() and "?" in line:
+        values = [fix_text(value) for value in values]
 
+    if not values or not values[0]:
+        return None
 
-def chunked(sequence: Sequence[str], size: int) -> Iterable[Sequence[str]]:
-    for index in range(0, len(sequence), size):
-        yield sequence[index : index + size]
+    return dict(zip(COLUMNS, values))
 
 
 def extract_date(rep_fecha: str | None) -> str | None:
     if not rep_fecha:
         return None
-    candidate = rep_fecha.strip()[:10]
-    if len(candidate) != 10:
-        return None
-    try:
-        year, month, day = candidate.split("-")
-    except ValueError:
-        return None
-    if len(year) != 4:
-        return None
-    return candidate
+    match = DATE_PATTERN.match(rep_fecha)
+    return match.group(1) if match else None
 
 
-def insert_records(records: Sequence[dict], source: str) -> Tuple[int, int, int]:
+def insert_records(
+    records: Sequence[dict], source: str, only_if_empty: bool = False
+) -> Tuple[int, int, int]:
     if not records:
         return 0, 0, 0
 
+    source = fix_text(source)
     prepared: List[tuple] = []
     keys: List[str] = []
     ignored = 0
 
     for record in records:
-        detail = fix_text(record.get("RepDetalleRechazo", ""))
-        record = {column: fix_text(record.get(column, "")) for column in COLUMNS}
-        record["RepDetalleRechazo"] = detail
+        values = tuple(record.get(column, "") for column in COLUMNS)
 
-        detail_normalized = normalize_detail(detail)
-        if any(detail_normalized.startswith(prefix) for prefix in IGNORED_DETAIL_PREFIXES):
+        detail_normalized = normalize_detail(values[DETAIL_INDEX])
+        if detail_normalized.startswith(IGNORED_DETAIL_PREFIXES):
             ignored += 1
             continue
 
-        key = build_key(record)
-        if not key:
-            continue
-
-        prepared.append((record, key, detail_normalized))
+        key = "||".join(values)
+        prepared.append((values, key, detail_normalized))
         keys.append(key)
 
     if not prepared:
@@ -224,46 +314,28 @@ def insert_records(records: Sequence[dict], source: str) -> Tuple[int, int, int]
     duplicates = 0
 
     try:
-        existing: dict[str, sqlite3.Row] = {}
-        for chunk in chunked(keys, 500):
-            placeholders = ",".join("?" for _ in chunk)
-            query = f"SELECT id, sources FROM rows WHERE id IN ({placeholders})"
-            for row in conn.execute(query, chunk):
-                existing[row["id"]] = row
-
-        now = int(time.time() * 1000)
+        conn.execute("BEGIN IMMEDIATE")
+        if only_if_empty and conn.execute("SELECT 1 FROM rows LIMIT 1").fetchone() is not None:
+            conn.rollback()
+            return 0, 0, ignored
+        keys_json = json.dumps(keys, ensure_ascii=False)
+        existing = {
+            row["id"]
+            for row in conn.execute(
+                "SELECT id FROM rows WHERE id IN (SELECT value FROM json_each(?))",
+                (keys_json,),
+            )
+        }
+
         inserts: List[tuple] = []
 
-        for index, (record, key, detail_normalized) in enumerate(prepared):
+        for values, key, detail_normalized in prepared:
             if key in existing:
                 duplicates += 1
-                sources_raw = existing[key]["sources"] if existing[key] else None
-                sources: List[str] = json.loads(sources_raw) if sources_raw else []
-                if source not in sources:
-                    sources.append(source)
-                    conn.execute(
-                        "UPDATE rows SET sources = ? WHERE id = ?",
-                        (json.dumps(sources, ensure_ascii=False), key),
-                    )
                 continue
 
-            rep_date = extract_date(record.get("RepFecha"))
-            sources = json.dumps([source], ensure_ascii=False)
-            inserts.append(
-                (
-                    key,
-                    record.get("EmpRUC", ""),
-                    record.get("EmpRazonSocial", ""),
-                    record.get("EmpNom", ""),
-                    record.get("RepFecha", ""),
-                    rep_date,
-                    record.get("RepLiqEstadoConsulta", ""),
-                    record.get("RepDetalleRechazo", ""),
-                    detail_normalized,
-                    sources,
-                    now + index,
-                )
-            )
+            rep_date = extract_date(values[DATE_INDEX])
+            inserts.append((key, *values, rep_date, detail_normalized))
             added += 1
 
         if inserts:
@@ -275,23 +347,69 @@ def insert_records(records: Sequence[dict], source: str) -> Tuple[int, int, int]
                     EmpRazonSocial,
                     EmpNom,
                     RepFecha,
-                    RepFechaDate,
                     RepLiqEstadoConsulta,
                     RepDetalleRechazo,
+                    RepFechaDate,
                     detail_normalized,
-                    sources,
                     created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ) VALUES (
+                    ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                    CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)
+                )
                 """,
                 inserts,
             )
+            conn.execute(
+                "INSERT INTO rows_fts (rowid, detail_normalized) "
+                "SELECT rowid, detail_normalized FROM rows "
+                "WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps([insert[0] for insert in inserts], ensure_ascii=False),),
+            )
+        conn.execute(
+            "INSERT OR IGNORE INTO row_sources (row_id, source) "
+            "SELECT value, ? FROM json_each(?) ORDER BY key",
+            (source, keys_json),
+        )
         conn.commit()
-    finally:
-        conn.close()
+    except Exception:
+        conn.rollback()
+        raise
 
     return added, duplicates, ignored
 
 
+def json_response(payload: dict) -> Response:
+    return app.response_class(orjson.dumps(payload), mimetype="application/json")
+
+
+def rows_beyond(
+    conn: sqlite3.Connection, filters: List[str], params: List[str], row: sqlite3.Row, comparison: str
+) -> bool:
+    conditions = [*filters, f"(created_at, rowid) {comparison} (?, ?)"]
+    query = f"SELECT EXISTS (SELECT 1 FROM rows WHERE {' AND '.join(conditions)})"
+    return bool(conn.execute(query, [*params, row["created_at"], row["rowid"]]).fetchone()[0])
+
+
+def encode_cursor(direction: str, row: sqlite3.Row) -> str:
+    raw = orjson.dumps([direction, row["created_at"], row["rowid"]])
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(value: str | None) -> Tuple[str, int, int] | None:
+    if not value:
+        return None
+    try:
+        direction, created_at, rowid = orjson.loads(base64.urlsafe_b64decode(value))
+    except (ValueError, TypeError):
+        return None
+    if direction not in ("after", "before"):
+        return None
+    for number in (created_at, rowid):
+        if type(number) is not int or not -(2**63) <= number < 2**63:
+            return None
+    return direction, created_at, rowid
+
+
 @app.route("/")
 def root() -> "str":
     return send_from_directory(BASE_DIR, "index.html")
@@ -307,6 +425,7 @@ def api_rows():
     detail = request.args.get("detail", "").strip()
     page_param = request.args.get("page")
     page_size_param = request.args.get("page_size")
+    cursor = decode_cursor(request.args.get("cursor"))
 
     if from_date:
         filters.append("RepFechaDate >= ?")
@@ -315,8 +434,12 @@ def api_rows():
         filters.append("RepFechaDate <= ?")
         params.append(to_date)
     if detail:
-        filters.append("detail_normalized LIKE ?")
-        params.append(f"%{normalize_detail(detail)}%")
+        needle = normalize_detail(detail)
+        if len(needle) >= 3:
+            filters.append("rowid IN (SELECT rowid FROM rows_fts WHERE detail_normalized LIKE ?)")
+        else:
+            filters.append("detail_normalized LIKE ?")
+        params.append(f"%{needle}%")
 
     where_clause = f" WHERE {' AND '.join(filters)}" if filters else ""
 
@@ -333,62 +456,92 @@ def api_rows():
     page_size = max(1, min(page_size, 200))
 
     conn = get_connection()
-    try:
-        total_query = f"SELECT COUNT(*) FROM rows{where_clause}"
-        total = conn.execute(total_query, params).fetchone()[0]
-        total_pages = max(1, math.ceil(total / page_size)) if total else 1
-        if page > total_pages:
-            page = total_pages
-
-        offset = (page - 1) * page_size
-
-        rows_query = (
-            "SELECT id, EmpRUC, EmpRazonSocial, EmpNom, RepFecha, RepLiqEstadoConsulta, "
-            "RepDetalleRechazo, resolved, sources, RepFechaDate FROM rows"
-            f"{where_clause} ORDER BY created_at, id LIMIT ? OFFSET ?"
-        )
-        query_params = list(params) + [page_size, offset]
-        rows = conn.execute(rows_query, query_params).fetchall()
-
-        count_all = conn.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
-        resolved_count = conn.execute("SELECT COUNT(*) FROM rows WHERE resolved = 1").fetchone()[0]
-        min_max = conn.execute(
-            "SELECT MIN(RepFechaDate), MAX(RepFechaDate) FROM rows "
-            "WHERE RepFechaDate IS NOT NULL AND RepFechaDate != ''"
-        ).fetchone()
-
-        bounds = None
-        if min_max and (min_max[0] or min_max[1]):
-            bounds = {"min": min_max[0], "max": min_max[1]}
-
-        payload = {
-            "rows": [
-                {
-                    "id": row["id"],
-                    "EmpRUC": fix_text(row["EmpRUC"]),
-                    "EmpRazonSocial": fix_text(row["EmpRazonSocial"]),
-                    "EmpNom": fix_text(row["EmpNom"]),
-                    "RepFecha": fix_text(row["RepFecha"]),
-                    "RepLiqEstadoConsulta": fix_text(row["RepLiqEstadoConsulta"]),
-                    "RepDetalleRechazo": fix_text(row["RepDetalleRechazo"]),
-                    "resolved": bool(row["resolved"]),
-                    "sources": [fix_text(source) for source in (json.loads(row["sources"]) if row["sources"] else [])],
-                    "rep_date": row["RepFechaDate"],
-                }
-                for row in rows
-            ],
-            "total": total,
-            "count_all": count_all,
-            "resolved_count": resolved_count,
-            "bounds": bounds,
-            "page": page,
-            "page_size": page_size,
-            "total_pages": total_pages,
-        }
+    stats_query = (
+        f"SELECT (SELECT COUNT(*) FROM rows{where_clause}) AS total, "
+        "(SELECT COUNT(*) FROM rows) AS count_all, "
+        "(SELECT COUNT(*) FROM rows WHERE resolved = 1) AS resolved_count, "
+        "(SELECT MIN(RepFechaDate) FROM rows "
+        "WHERE RepFechaDate IS NOT NULL AND RepFechaDate != '') AS min_date, "
+        "(SELECT MAX(RepFechaDate) FROM rows "
+        "WHERE RepFechaDate IS NOT NULL AND RepFechaDate != '') AS max_date"
+    )
+    stats = conn.execute(stats_query, params).fetchone()
+    total = stats["total"]
+    total_pages = max(1, math.ceil(total / page_size)) if total else 1
+    if page > total_pages:
+        page = total_pages
+
+    rows_filters = list(filters)
+    query_params = list(params)
+    direction = cursor[0] if cursor is not None else "after"
+    order = "created_at, rowid"
+    pagination = "LIMIT ? OFFSET ?"
+    if cursor is not None:
+        _, created_at, rowid = cursor
+        if direction == "after":
+            rows_filters.append("(created_at, rowid) > (?, ?)")
+        else:
+            rows_filters.append("(created_at, rowid) < (?, ?)")
+            order = "created_at DESC, rowid DESC"
+        query_params.extend([created_at, rowid, page_size + 1])
+        pagination = "LIMIT ?"
+    else:
+        query_params.extend([page_size + 1, (page - 1) * page_size])
+    rows_where = f" WHERE {' AND '.join(rows_filters)}" if rows_filters else ""
+
+    rows_query = (
+        "SELECT id, EmpRUC, EmpRazonSocial, EmpNom, RepFecha, RepLiqEstadoConsulta, "
+        "RepDetalleRechazo, resolved, RepFechaDate, created_at, rowid, "
+        "(SELECT json_group_array(source) FROM "
+        "(SELECT source FROM row_sources WHERE row_id = rows.id ORDER BY rowid)) AS sources "
+        "FROM rows"
+        f"{rows_where} ORDER BY {order} {pagination}"
+    )
+    rows = conn.execute(rows_query, query_params).fetchall()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == "before":
+        rows.reverse()
+        has_prev = has_more
+        has_next = bool(rows) and rows_beyond(conn, filters, params, rows[-1], ">")
+    else:
+        has_next = has_more
+        has_prev = bool(rows) and rows_beyond(conn, filters, params, rows[0], "<")
+    if rows and not has_prev:
+        page = 1
 
-        return jsonify(payload)
-    finally:
-        conn.close()
+    bounds = None
+    if stats["min_date"] or stats["max_date"]:
+        bounds = {"min": stats["min_date"], "max": stats["max_date"]}
+
+    payload = {
+        "rows": [
+            {
+                "id": row["id"],
+                "EmpRUC": row["EmpRUC"],
+                "EmpRazonSocial": row["EmpRazonSocial"],
+                "EmpNom": row["EmpNom"],
+                "RepFecha": row["RepFecha"],
+                "RepLiqEstadoConsulta": row["RepLiqEstadoConsulta"],
+                "RepDetalleRechazo": row["RepDetalleRechazo"],
+                "resolved": bool(row["resolved"]),
+                "sources": orjson.Fragment(row["sources"]),
+                "rep_date": row["RepFechaDate"],
+            }
+            for row in rows
+        ],
+        "total": total,
+        "count_all": stats["count_all"],
+        "resolved_count": stats["resolved_count"],
+        "bounds": bounds,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages,
+        "next_cursor": encode_cursor("after", rows[-1]) if has_next else None,
+        "prev_cursor": encode_cursor("before", rows[0]) if has_prev else None,
+    }
+
+    return json_response(payload)
 
 
 @app.route("/api/upload", methods=["POST"])
@@ -426,47 +579,51 @@ def api_upload():
         totals["duplicates"] += duplicates
         totals["ignored"] += ignored
 
-    return jsonify({"files": summaries, "totals": totals})
+    return json_response({"files": summaries, "totals": totals})
 
 
 @app.route("/api/rows/<path:row_id>/toggle", methods=["POST"])
 def api_toggle(row_id: str):
     conn = get_connection()
-    try:
-        row = conn.execute("SELECT resolved FROM rows WHERE id = ?", (row_id,)).fetchone()
-        if row is None:
-            abort(404, description="Fila no encontrada.")
-        new_value = 0 if row["resolved"] else 1
-        conn.execute("UPDATE rows SET resolved = ? WHERE id = ?", (new_value, row_id))
-        conn.commit()
-        return jsonify({"id": row_id, "resolved": bool(new_value)})
-    finally:
-        conn.close()
+    row = conn.execute("SELECT resolved FROM rows WHERE id = ?", (row_id,)).fetchone()
+    if row is None:
+        abort(404, description="Fila no encontrada.")
+    new_value = 0 if row["resolved"] else 1
+    conn.execute("UPDATE rows SET resolved = ? WHERE id = ?", (new_value, row_id))
+    conn.commit()
+    return json_response({"id": row_id, "resolved": bool(new_value)})
 
 
 @app.route("/api/rows/resolved", methods=["DELETE"])
 def api_delete_resolved():
     conn = get_connection()
-    try:
-        cursor = conn.execute("DELETE FROM rows WHERE resolved = 1")
-        conn.commit()
-        return jsonify({"deleted": cursor.rowcount})
-    finally:
-        conn.close()
+    conn.execute(
+        "DELETE FROM row_sources WHERE row_id IN (SELECT id FROM rows WHERE resolved = 1)"
+    )
+    cursor = conn.execute("DELETE FROM rows WHERE resolved = 1")
+    conn.commit()
+    return json_response({"deleted": cursor.rowcount})
+
+
+@app.teardown_appcontext
+def rollback_connection(error) -> None:
+    conn = getattr(_local, "conn", None)
+    if conn is not None and conn.in_transaction:
+        conn.rollback()
 
 
 @app.errorhandler(400)
 def handle_400(error):
-    return jsonify({"error": error.description}), 400
+    return json_response({"error": error.description}), 400
 
 
 @app.errorhandler(404)
 def handle_404(error):
-    return jsonify({"error": error.description}), 404
+    return json_response({"error": error.description}), 404
 
 
 ensure_database()
-maybe_load_initial_data()
+threading.Thread(target=maybe_load_initial_data, name="initial-data-load", daemon=True).start()
 
 
 if __name__ == "__main__":